@@ -1,11 +1,43 @@
+import array
+import bisect
+import hashlib
+import logging
+import os
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Dict, Any
-from flask import Flask, request, render_template_string
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from typing import List, Dict, Iterator, Optional, Tuple
+from flask import Flask, Response, request, stream_with_context, url_for
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # optional: fall back to the regex scanner
+    numba = None
+
+logger = logging.getLogger(__name__)
 
 # ---------------- CONFIG ----------------
 MODEL_NAME = "t5-small"
+# "int8" quantizes weights (dynamic int8 on CPU, bitsandbytes on CUDA);
+# "half" loads FP16 on CUDA / BF16 on CPU; "none" keeps FP32.
+QUANTIZE = os.getenv("QUANTIZE", "int8").lower()
+# Greedy decoding is plenty for short templated fixes; raise for beam search.
+NUM_BEAMS = int(os.getenv("NUM_BEAMS", "1"))
+MAX_NEW_TOKENS = int(os.getenv("MAX_NEW_TOKENS", "96"))
+# Prompts are ~50 tokens; a tight cap keeps encoder attention small on pathological lines.
+MAX_INPUT_TOKENS = 256
+SUGGESTION_CACHE_SIZE = int(os.getenv("SUGGESTION_CACHE_SIZE", "4096"))
+# "auto" runs an exported ONNX model through onnxruntime when optimum is installed and
+# ONNX_MODEL_DIR exists, otherwise torch; "torch" forces the torch path. Export once with:
+#   optimum-cli export onnx --model t5-small onnx_t5/
+#   optimum-cli onnxruntime quantize --onnx_model onnx_t5/ --avx512 -o onnx_t5_int8/
+# and point ONNX_MODEL_DIR at onnx_t5_int8/ to use the int8 kernels.
+BACKEND = os.getenv("BACKEND", "auto").lower()
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "onnx_t5")
 
 # ---------------- SIMPLE ANALYZER ----------------
 @dataclass
@@ -16,212 +48,370 @@ class Issue:
     message: str
     snippet: str
 
-def detect_issues(filename: str, text: str) -> List[Issue]:
-    issues: List[Issue] = []
-    lines = text.splitlines()
-    for i, line in enumerate(lines, start=1):
-      # Style: long lines
-        if len(line) > 120:
-            issues.append(Issue(filename, i, "Style", f"Line length {len(line)} exceeds 120 chars", line))
-      # Maintainability: TODO comments
-        if "TODO" in line:
-            issues.append(Issue(filename, i, "Maintainability", "TODO left in code", line))
-      # Best practice: print statements
-        if "print(" in line:
-            issues.append(Issue(filename, i, "BestPractice", "Avoid print in library code; prefer logging", line))
-      # Error handling: bare except
-        if re.match(r"^\s*except\s*:\s*$", line):
-            issues.append(Issue(filename, i, "ErrorHandling", "Bare except detected; catch specific exceptions", line))
-    return issues
+MAX_LINE_LENGTH = 120
+
+# Rule ids double as category ids, in the order rules are reported within a line.
+CATEGORIES = ("Style", "Maintainability", "BestPractice", "ErrorHandling")
+STYLE, MAINTAINABILITY, BEST_PRACTICE, ERROR_HANDLING = range(len(CATEGORIES))
+_MESSAGES = (
+    None,  # Style messages carry the line length
+    "TODO left in code",
+    "Avoid print in library code; prefer logging",
+    "Bare except detected; catch specific exceptions",
+)
+
+class IssueSet:
+    """Issues for one file, stored as parallel arrays instead of per-issue objects."""
+
+    def __init__(self, file: str, lines: np.ndarray, cat_ids: np.ndarray, snippets: List[str]):
+        self.file = file
+        self.lines = lines
+        self.cat_ids = cat_ids
+        self.snippets = snippets
+        self.messages = [
+            f"Line length {len(snippet)} exceeds {MAX_LINE_LENGTH} chars" if cat == STYLE else _MESSAGES[cat]
+            for cat, snippet in zip(cat_ids.tolist(), snippets)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.snippets)
+
+    def __getitem__(self, index: slice) -> "IssueSet":
+        return IssueSet(self.file, self.lines[index], self.cat_ids[index], self.snippets[index])
+
+    def __iter__(self) -> Iterator[Issue]:
+        for line, cat, message, snippet in zip(self.lines.tolist(), self.cat_ids.tolist(), self.messages, self.snippets):
+            yield Issue(self.file, line, CATEGORIES[cat], message, snippet)
+
+    @property
+    def categories(self) -> List[str]:
+        return [CATEGORIES[cat] for cat in self.cat_ids.tolist()]
+
+    def take(self, indices: List[int]) -> "IssueSet":
+        return IssueSet(self.file, self.lines[indices], self.cat_ids[indices], [self.snippets[i] for i in indices])
+
+    def category_counts(self) -> np.ndarray:
+        return np.bincount(self.cat_ids, minlength=len(CATEGORIES))
+
+# Literal rules, matched in one pass over the whole upload when numba is not installed;
+# all are ASCII, so scan raw bytes with a single regex alternation.
+_LITERAL_RULES = {b"TODO": MAINTAINABILITY, b"print(": BEST_PRACTICE}
+_RULES = re.compile(b"|".join(re.escape(word) for word in _LITERAL_RULES))
+# Bare except is the expensive pattern and rarely present; only run it when "except" occurs.
+# Horizontal whitespace only (not \s), so a match never spans lines; trailing \r runs
+# (CRLF endings, possibly converted twice) are ignored, as in _decode_line and _scan_bytes.
+_EXCEPT_RE = re.compile(rb"^[ \t\f\v]*except[ \t\f\v]*:[ \t\f\v]*\r*$", re.MULTILINE)
+
+def _decode_line(line: bytes) -> str:
+    # Every trailing \r is dropped; _scan_bytes trims line ends the same way.
+    return line.rstrip(b"\r").decode("utf-8", errors="replace")
+
+def _detect_issues_regex(filename: str, data: bytes) -> IssueSet:
+    lines = data.split(b"\n")
+    line_starts = [0] + [m.end() for m in re.finditer(rb"\n", data)]
+    # Style: long lines (byte length bounds char length, so only decode candidates)
+    hits = {
+        (i, STYLE) for i, line in enumerate(lines, start=1)
+        if len(line) > MAX_LINE_LENGTH and len(_decode_line(line)) > MAX_LINE_LENGTH
+    }
+    # Maintainability / BestPractice: TODO, print
+    for m in _RULES.finditer(data):
+        hits.add((bisect.bisect_right(line_starts, m.start()), _LITERAL_RULES[m.group()]))
+    # Error handling: bare except
+    if b"except" in data:
+        for m in _EXCEPT_RE.finditer(data):
+            hits.add((bisect.bisect_right(line_starts, m.start()), ERROR_HANDLING))
+    line_nos = array.array("i")
+    cat_ids = array.array("b")
+    snippets: List[str] = []
+    for i, cat in sorted(hits):
+        line_nos.append(i)
+        cat_ids.append(cat)
+        snippets.append(_decode_line(lines[i - 1]))
+    return IssueSet(filename, np.asarray(line_nos, dtype=np.int32), np.asarray(cat_ids, dtype=np.int8), snippets)
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _is_space(b):
+        # Same set as _EXCEPT_RE; a trailing \r is already excluded from the line.
+        return b == 32 or b == 9 or b == 12 or b == 11
+
+    @numba.njit(cache=True)
+    def _is_bare_except(buf, start, end):
+        i = start
+        while i < end and _is_space(buf[i]):
+            i += 1
+        if end - i < 6 or not (buf[i] == 101 and buf[i + 1] == 120 and buf[i + 2] == 99
+                               and buf[i + 3] == 101 and buf[i + 4] == 112 and buf[i + 5] == 116):
+            return False
+        i += 6
+        while i < end and _is_space(buf[i]):
+            i += 1
+        if i >= end or buf[i] != 58:
+            return False
+        i += 1
+        while i < end and _is_space(buf[i]):
+            i += 1
+        return i == end
+
+    @numba.njit(cache=True)
+    def _scan_bytes(buf, max_line_length, line_out, rule_out, start_out, end_out):
+        # One pass over UTF-8 bytes; emits (line, rule, start, end) per hit in report order.
+        # Long lines are flagged by byte length, an upper bound on the decoded length;
+        # the caller re-checks those candidates after decoding.
+        n = len(buf)
+        k = 0
+        line_no = 1
+        start = 0
+        todo = False
+        prnt = False
+        for i in range(n + 1):
+            if i == n or buf[i] == 10:
+                end = i
+                while end > start and buf[end - 1] == 13:  # same trim as _decode_line
+                    end -= 1
+                if end - start > max_line_length:
+                    line_out[k], rule_out[k], start_out[k], end_out[k] = line_no, 0, start, end
+                    k += 1
+                if todo:
+                    line_out[k], rule_out[k], start_out[k], end_out[k] = line_no, 1, start, end
+                    k += 1
+                if prnt:
+                    line_out[k], rule_out[k], start_out[k], end_out[k] = line_no, 2, start, end
+                    k += 1
+                if _is_bare_except(buf, start, end):
+                    line_out[k], rule_out[k], start_out[k], end_out[k] = line_no, 3, start, end
+                    k += 1
+                line_no += 1
+                start = i + 1
+                todo = False
+                prnt = False
+                continue
+            b = buf[i]
+            if b == 84 and i + 3 < n and buf[i + 1] == 79 and buf[i + 2] == 68 and buf[i + 3] == 79:
+                todo = True
+            elif (b == 112 and i + 5 < n and buf[i + 1] == 114 and buf[i + 2] == 105
+                  and buf[i + 3] == 110 and buf[i + 4] == 116 and buf[i + 5] == 40):
+                prnt = True
+        return k
+
+    def _detect_issues_numba(filename: str, data: bytes) -> IssueSet:
+        buf = np.frombuffer(data, dtype=np.uint8)
+        capacity = 4 * (int(np.count_nonzero(buf == 10)) + 1)
+        line_out = np.empty(capacity, dtype=np.int64)
+        rule_out = np.empty(capacity, dtype=np.int8)
+        start_out = np.empty(capacity, dtype=np.int64)
+        end_out = np.empty(capacity, dtype=np.int64)
+        k = _scan_bytes(buf, MAX_LINE_LENGTH, line_out, rule_out, start_out, end_out)
+        snippets = [data[start:end].decode("utf-8", errors="replace") for start, end in zip(start_out[:k].tolist(), end_out[:k].tolist())]
+        # Drop long-line candidates whose decoded length is within the limit.
+        keep = np.fromiter(
+            (cat != STYLE or len(snippet) > MAX_LINE_LENGTH for cat, snippet in zip(rule_out[:k].tolist(), snippets)),
+            dtype=bool, count=k,
+        )
+        snippets = [snippet for snippet, kept in zip(snippets, keep.tolist()) if kept]
+        return IssueSet(filename, line_out[:k][keep].astype(np.int32), rule_out[:k][keep], snippets)
+
+def detect_issues(filename: str, data: bytes) -> IssueSet:
+    if numba is not None:
+        return _detect_issues_numba(filename, data)
+    return _detect_issues_regex(filename, data)
 
 # ---------------- LLM SUGGESTER ----------------
+def _ort_model_class():
+    if BACKEND == "torch" or not os.path.isdir(ONNX_MODEL_DIR):
+        return None
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError:
+        return None
+    return ORTModelForSeq2SeqLM
+
+_STRING_RE = re.compile(r"(\"[^\"]*\"|'[^']*')")
+_NUMBER_RE = re.compile(r"\d+")
+_SPACE_RE = re.compile(r"\s+")
+
+# Rule description per category for the prompt. Style uses a generic message since the
+# actual line length would make every long line a distinct cache key.
+_PROMPT_MESSAGES = dict(zip(CATEGORIES, (f"Line length exceeds {MAX_LINE_LENGTH} chars",) + _MESSAGES[1:]))
+
+def normalize_snippet(snippet: str) -> str:
+    # Collapse literals and whitespace so near-identical lines share a cached suggestion.
+    s = _STRING_RE.sub('"STR"', snippet.strip())
+    s = _NUMBER_RE.sub("0", s)
+    return _SPACE_RE.sub(" ", s)
+
 class LLMSuggester:
     def __init__(self):
+        # torch/transformers take seconds and hundreds of MB to import; only pay that
+        # once a request actually needs suggestions.
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+        device = "cuda" if torch.cuda.is_available() else "cpu"
         self.tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-        self.model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME)
+        self.autocast_dtype = None
+        ort_model_class = _ort_model_class()
+        if ort_model_class is not None:
+            # Quantization, if any, was applied at export time.
+            self.model = ort_model_class.from_pretrained(ONNX_MODEL_DIR)
+        elif QUANTIZE == "int8" and device == "cuda":
+            from transformers import BitsAndBytesConfig
+            try:
+                self.model = AutoModelForSeq2SeqLM.from_pretrained(
+                    MODEL_NAME, quantization_config=BitsAndBytesConfig(load_in_8bit=True), device_map="auto"
+                )
+            except ImportError as exc:  # bitsandbytes / accelerate not installed
+                logger.warning("CUDA int8 unavailable (%s); loading FP32 weights instead", exc)
+                self.model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME).to(device)
+        elif QUANTIZE == "int8":
+            self.model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME)
+            self.model = torch.ao.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        elif QUANTIZE == "half":
+            self.autocast_dtype = torch.float16 if device == "cuda" else torch.bfloat16
+            if device == "cpu":
+                torch.set_float32_matmul_precision("medium")
+            self.model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME, torch_dtype=self.autocast_dtype).to(device)
+        else:
+            self.model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME).to(device)
+        if isinstance(self.model, torch.nn.Module):
+            self.model.eval()
+        self.device = self.model.device
+        # LRU of (category, normalized snippet) -> suggestion; repeated rule hits skip the model.
+        self._cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Static prompt pieces (per-category header, instruction) are tokenized once;
+        # only the snippet is encoded per call.
+        self._category_ids: Dict[str, List[int]] = {}
+        self._suffix_ids = self.tokenizer("\n\nSuggest a fix with explanation.", add_special_tokens=False).input_ids
+
+    def _prompt_ids(self, category: str, snippet: str) -> List[int]:
+        prefix = self._category_ids.get(category)
+        if prefix is None:
+            message = _PROMPT_MESSAGES.get(category)
+            header = f"Category: {category}\nIssue: {message}\n" if message else f"Category: {category}\n"
+            prefix = self.tokenizer(header + "Snippet:\n", add_special_tokens=False).input_ids
+            self._category_ids[category] = prefix
+        budget = MAX_INPUT_TOKENS - len(prefix) - len(self._suffix_ids) - 1
+        body = self.tokenizer(snippet, add_special_tokens=False).input_ids[:max(budget, 0)]
+        return prefix + body + self._suffix_ids + [self.tokenizer.eos_token_id]
 
     def suggest_for_issue(self, issue: Issue) -> str:
-        prompt = (
-            f"File: {issue.file}\nLine: {issue.line}\nCategory: {issue.category}\n"
-            f"Issue: {issue.message}\nSnippet:\n{issue.snippet}\n\n"
-            f"Suggest a fix with explanation."
-        )
-        inputs = self.tokenizer.encode(prompt, return_tensors="pt", max_length=512, truncation=True)
-        outputs = self.model.generate(inputs, max_length=200, num_beams=4)
-        return self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+        return self._suggest([(issue.category, normalize_snippet(issue.snippet))])[0]
+
+    def suggest_batch(self, issues: IssueSet) -> List[str]:
+        return self._suggest([
+            (category, normalize_snippet(snippet)) for category, snippet in zip(issues.categories, issues.snippets)
+        ])
+
+    def _suggest(self, keys: List[Tuple[str, str]]) -> List[str]:
+        results: Dict[Tuple[str, str], str] = {}
+        with self._cache_lock:
+            for key in dict.fromkeys(keys):
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    results[key] = self._cache[key]
+        misses = [key for key in dict.fromkeys(keys) if key not in results]
+        if misses:
+            input_ids = [self._prompt_ids(category, snippet) for category, snippet in misses]
+            # Pad to the longest prompt in this batch only; the mask keeps padding out of attention.
+            enc = self.tokenizer.pad({"input_ids": input_ids}, padding="longest", return_tensors="pt").to(self.device)
+            outputs = self._generate(input_ids=enc.input_ids, attention_mask=enc.attention_mask)
+            results.update(zip(misses, self.tokenizer.batch_decode(outputs, skip_special_tokens=True)))
+            with self._cache_lock:
+                for key in misses:
+                    self._cache[key] = results[key]
+                while len(self._cache) > SUGGESTION_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return [results[key] for key in keys]
+
+    def _generate(self, *args, **kwargs):
+        import torch
+
+        with torch.inference_mode(), torch.autocast(
+            device_type=self.device.type, dtype=self.autocast_dtype, enabled=self.autocast_dtype is not None
+        ):
+            return self.model.generate(
+                *args,
+                max_new_tokens=MAX_NEW_TOKENS,
+                num_beams=NUM_BEAMS,
+                do_sample=False,
+                use_cache=True,
+                early_stopping=NUM_BEAMS > 1,
+                **kwargs,
+            )
+
+# Loaded once per process, on the first request that needs it; from_pretrained
+# is far too slow to run per request.
+SUGGESTER = None
+_SUGGESTER_LOCK = threading.Lock()
+
+def get_suggester() -> LLMSuggester:
+    global SUGGESTER
+    if SUGGESTER is None:
+        with _SUGGESTER_LOCK:
+            SUGGESTER = SUGGESTER or LLMSuggester()
+    return SUGGESTER
+
+# Canned fixes for the built-in rules; the model only runs for categories without
+# one, or for every issue when use_ai is set.
+SUGGESTION_TEMPLATES = {
+    "Style": "Wrap the line at 100 chars; extract sub-expressions into named temporaries.",
+    "Maintainability": "Replace the TODO with a tracked issue reference or implement it.",
+    "BestPractice": "Replace `print(...)` with `logging.getLogger(__name__).info(...)`.",
+    "ErrorHandling": "Catch the specific exception type(s) instead of a bare `except:`.",
+}
+
+def suggest_issues(issues: IssueSet, use_ai: bool = False) -> List[str]:
+    if use_ai:
+        return get_suggester().suggest_batch(issues)
+    suggestions = [SUGGESTION_TEMPLATES.get(category) for category in issues.categories]
+    missing = [i for i, suggestion in enumerate(suggestions) if suggestion is None]
+    if missing:
+        for i, suggestion in zip(missing, get_suggester().suggest_batch(issues.take(missing))):
+            suggestions[i] = suggestion
+    return suggestions
 
 # ---------------- FLASK APP ----------------
-app = Flask(__name__)
+app = Flask(__name__, static_folder="static")
+
+# CSS/JS live in static/ and are cached forever by the browser; the content hash
+# in the URL changes whenever a file does.
+_ASSET_VERSIONS: Dict[str, str] = {}
+
+def static_url(filename: str) -> str:
+    if filename not in _ASSET_VERSIONS:
+        with open(os.path.join(app.static_folder, filename), "rb") as f:
+            _ASSET_VERSIONS[filename] = hashlib.sha1(f.read()).hexdigest()[:12]
+    return url_for("static", filename=filename, v=_ASSET_VERSIONS[filename])
+
+app.jinja_env.globals["static_url"] = static_url
+
+@app.after_request
+def cache_static_assets(response):
+    # Only versioned URLs are safe to cache forever; errors and bare URLs keep the default.
+    if request.endpoint == "static" and response.status_code == 200 and request.args.get("v"):
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
 
-TEMPLATE = """
+# Rows are streamed in chunks of this many issues, one batched generate call per chunk.
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "8"))
+# Worker threads generating upcoming chunks while earlier rows are written out;
+# torch already uses all cores per generate call, so more than a couple oversubscribes.
+SUGGEST_WORKERS = int(os.getenv("SUGGEST_WORKERS", "1"))
+
+# The page is streamed in three parts: everything up to the findings <tbody>,
+# one fragment per row as its suggestion is ready, then the charts script once
+# all category counts are known.
+TEMPLATE_HEAD = """
 <!DOCTYPE html>
 <html>
 <head>
   <title>AI Code Review Assistant</title>
   <meta charset="utf-8"/>
-  <style>
-    :root {
-      --bg-grad-light: linear-gradient(135deg, #74ebd5 0%, #ACB6E5 100%);
-      --primary: #3498db;
-      --accent: #16a085;
-      --text: #333;
-      --card-bg: #fff;
-      --code-bg: #f4f4f4;
-      --hover: #eaf2f8;
-    }
-    body {
-      font-family: 'Segoe UI', system-ui, -apple-system, Arial, sans-serif;
-      margin: 0;
-      padding: 0;
-      background: var(--bg-grad-light);
-      min-height: 100vh;
-      color: var(--text);
-      transition: background 0.4s ease, color 0.4s ease;
-    }
-    body.dark {
-      --bg-grad-light: linear-gradient(135deg, #1f2937 0%, #0f172a 100%);
-      --primary: #60a5fa;
-      --accent: #10b981;
-      --text: #f4f4f4;
-      --card-bg: #1f2937;
-      --code-bg: #111827;
-      --hover: #334155;
-      background: var(--bg-grad-light);
-      color: var(--text);
-    }
-    .container {
-      max-width: 1200px;
-      margin: auto;
-      padding: 40px 24px;
-    }
-    h2 {
-      text-align: center;
-      margin: 0 0 24px;
-      letter-spacing: 0.5px;
-    }
-    .subheader {
-      text-align: center;
-      margin: -8px 0 24px;
-      opacity: 0.85;
-    }
-    .card {
-      background: var(--card-bg);
-      border-radius: 14px;
-      box-shadow: 0 8px 30px rgba(0,0,0,0.12);
-      padding: 20px;
-      margin-bottom: 28px;
-      transition: background 0.4s ease, color 0.4s ease, transform 0.2s ease;
-      animation: fadeIn 0.6s ease;
-    }
-    .card:hover { transform: translateY(-2px); }
-    @keyframes fadeIn {
-      from {opacity: 0; transform: translateY(8px);}
-      to {opacity: 1; transform: translateY(0);}
-    }
-    label { font-weight: 600; }
-    textarea, input[type=file], button {
-      width: 100%;
-      padding: 12px 12px;
-      margin-top: 10px;
-      border-radius: 10px;
-      border: 1px solid #d1d5db;
-      font-size: 14px;
-      background: #fff;
-      transition: border-color 0.2s ease, box-shadow 0.2s ease;
-    }
-    body.dark textarea, body.dark input[type=file] {
-      background: #0b1220;
-      color: var(--text);
-      border: 1px solid #334155;
-    }
-    textarea:focus, input[type=file]:focus {
-      outline: none;
-      border-color: var(--primary);
-      box-shadow: 0 0 0 3px rgba(52,152,219,0.2);
-    }
-    button {
-      background: linear-gradient(135deg, #6a11cb 0%, var(--primary) 100%);
-      color: #fff;
-      border: none;
-      cursor: pointer;
-      transition: opacity 0.2s ease, transform 0.1s ease;
-      font-weight: 600;
-    }
-    button:hover { opacity: 0.92; }
-    button:active { transform: scale(0.99); }
-    .toggle-btn {
-      position: fixed;
-      top: -4px;
-      right: 18px;
-      background: var(--accent);
-      color: #fff;
-      border: none;
-      padding: 10px 14px;
-      border-radius: 10px;
-      cursor: pointer;
-      box-shadow: 0 6px 18px rgba(0,0,0,0.2);
-      z-index: 50;
-      font-weight: 600;
-    }
-    .toggle-btn:hover { filter: brightness(1.05); }
-    table {
-      width: 90%;
-      border-collapse: collapse;
-      margin-top: 8px;
-      border-radius: 10px;
-      overflow: hidden;
-    }
-    th, td {
-      padding: 12px;
-      border-bottom: 1px solid #e5e7eb;
-      text-align: left;
-    }
-    th {
-      background: var(--primary);
-      color: #fff;
-      font-weight: 700;
-      letter-spacing: 0.3px;
-    }
-    body.dark th { background: #334155; }
-    tr:nth-child(even) { background: #f9fafb; }
-    body.dark tr:nth-child(even) { background: #0b1220; }
-    tr:hover { background: var(--hover); }
-    .code {
-      background: var(--code-bg);
-      padding: 10px;
-      border-radius: 8px;
-      font-family: ui-monospace, SFMono-Regular, Menlo, monospace;
-      font-size: 13px;
-      line-height: 1.5;
-      overflow-x: auto;
-    }
-    .charts-grid {
-      display: grid;
-      grid-template-columns: repeat(auto-fit, minmax(320px, 1fr));
-      gap: 18px;
-      align-items: stretch;
-      justify-items: center;
-    }
-    .chart-card {
-      padding: 12px;
-      border-radius: 12px;
-      background: var(--card-bg);
-      box-shadow: 0 6px 18px rgba(0,0,0,0.08);
-      width: 100%;
-      max-width: 380px;
-    }
-    .chart-title {
-      font-weight: 700;
-      margin: 4px 8px 8px;
-      text-align: center;
-    }
-    .chart-wrap {
-      position: relative;
-      width: 100%;
-      height: 280px; /* medium height */
-    }
-  </style>
+  <link rel="stylesheet" href="{{ static_url('app.css') }}">
   <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+  <script src="{{ static_url('app.js') }}"></script>
 </head>
 <body>
   <button class="toggle-btn" onclick="toggleDarkMode()">🌙 Toggle Dark Mode</button>
@@ -239,7 +429,7 @@ TEMPLATE = """
       </form>
     </div>
 
-    {% if metrics %}
+    {% if show_results %}
     <div class="card">
       <h3 style="text-align:center; margin: 8px 0 18px;">📊 ISSUES OVERVIEW </h3>
       <div class="charts-grid">
@@ -271,131 +461,74 @@ TEMPLATE = """
           </tr>
         </thead>
         <tbody>
-          {% for m in metrics %}
+    {% endif %}
+"""
+
+ROW_TEMPLATE = """
           <tr>
             <td>{{ m.file }}</td>
             <td>{{ m.line }}</td>
             <td>{{ m.category }}</td>
             <td>{{ m.message }}</td>
             <td><div class="code">{{ m.snippet }}</div></td>
-            <td><div class="code">{{ m.suggestion }}</div></td>
+            <td><div class="code">{{ suggestion }}</div></td>
           </tr>
-          {% endfor %}
+"""
+
+TEMPLATE_TAIL = """
+    {% if show_results %}
         </tbody>
       </table>
     </div>
 
-    <script>
-      const metrics = {{ metrics|tojson }};
-      const counts = {};
-      metrics.forEach(m => { counts[m.category] = (counts[m.category] || 0) + 1; });
-
-      const labels = Object.keys(counts);
-      const values = Object.values(counts);
-      const colors = ['#e74c3c','#3498db','#2ecc71','#f1c40f','#9b59b6','#1abc9c','#fd79a8','#55efc4'];
-
-      // Chart.js global defaults responsive medium sizing
-      Chart.defaults.responsive = true;
-      Chart.defaults.maintainAspectRatio = false;
-
-      const commonOpts = {
-        plugins: {
-          legend: { position: 'bottom', labels: { boxWidth: 12, padding: 10 } },
-          tooltip: { enabled: true }
-        },
-        scales: {
-          x: { ticks: { color: getTextColor() }, grid: { display: false } },
-          y: { ticks: { color: getTextColor() }, grid: { color: getGridColor() } }
-        }
-      };
-
-      function getTextColor() {
-        return document.body.classList.contains('dark') ? '#e5e7eb' : '#333';
-      }
-      function getGridColor() {
-        return document.body.classList.contains('dark') ? '#334155' : '#e5e7eb';
-      }
-
-      const barCtx = document.getElementById('barChart').getContext('2d');
-      const doughnutCtx = document.getElementById('doughnutChart').getContext('2d');
-      const lineCtx = document.getElementById('lineChart').getContext('2d');
-      const polarCtx = document.getElementById('polarChart').getContext('2d');
-
-      let barChart = new Chart(barCtx, {
-        type: 'bar',
-        data: { labels, datasets: [{ label: 'Count', data: values, backgroundColor: colors }] },
-        options: commonOpts
-      });
-
-      let doughnutChart = new Chart(doughnutCtx, {
-        type: 'doughnut',
-        data: { labels, datasets: [{ data: values, backgroundColor: colors }] },
-        options: { plugins: { legend: { position: 'bottom' } } }
-      });
-
-      let lineChart = new Chart(lineCtx, {
-        type: 'line',
-        data: { labels, datasets: [{ label: 'Count', data: values, fill: false, borderColor: '#6a11cb', tension: 0.3, pointBackgroundColor: '#6a11cb' }] },
-        options: { plugins: { legend: { display: false } }, scales: { x: { ticks: { color: getTextColor() } }, y: { ticks: { color: getTextColor() }, grid: { color: getGridColor() } } } }
-      });
-
-      let polarChart = new Chart(polarCtx, {
-        type: 'polarArea',
-        data: { labels, datasets: [{ data: values, backgroundColor: colors }] },
-        options: { plugins: { legend: { position: 'bottom' } } }
-      });
-
-      // Update charts when theme toggles so tick/grid colors adapt
-      function refreshChartColors() {
-        const isDark = document.body.classList.contains('dark');
-        const tickColor = isDark ? '#e5e7eb' : '#333';
-        const gridColor = isDark ? '#334155' : '#e5e7eb';
-
-        [barChart, lineChart].forEach(chart => {
-          if (chart.options.scales) {
-            chart.options.scales.x.ticks.color = tickColor;
-            chart.options.scales.y.ticks.color = tickColor;
-            if (chart.options.scales.y.grid) chart.options.scales.y.grid.color = gridColor;
-          }
-          chart.update();
-        });
-      }
-
-      function toggleDarkMode() {
-        document.body.classList.toggle('dark');
-        refreshChartColors();
-      }
-      window.toggleDarkMode = toggleDarkMode; // expose to button
-    </script>
+    <script>renderCharts({{ cat_names|tojson }}, new Int32Array({{ counts|tojson }}));</script>
     {% endif %}
   </div>
 </body>
 </html>
 """
 
+# Parsed once at import; only .render() runs per request.
+_HEAD_TMPL = app.jinja_env.from_string(TEMPLATE_HEAD)
+_ROW_TMPL = app.jinja_env.from_string(ROW_TEMPLATE)
+_TAIL_TMPL = app.jinja_env.from_string(TEMPLATE_TAIL)
+
 @app.route("/", methods=["GET", "POST"])
 def index():
     code = ""
-    metrics: List[Dict[str, Any]] = []
+    issues: Optional[IssueSet] = None
     if request.method == "POST":
         code = request.form.get("code", "")
+        data = code.encode("utf-8")
         file = request.files.get("file")
         if file and file.filename:
-            code = file.read().decode("utf-8", errors="replace")
-        if code.strip():
-            issues = detect_issues("uploaded_code.py", code)
-            suggester = LLMSuggester()
-            for issue in issues:
-                suggestion = suggester.suggest_for_issue(issue)
-                metrics.append({
-                    "file": issue.file,
-                    "line": issue.line,
-                    "category": issue.category,
-                    "message": issue.message,
-                    "snippet": issue.snippet,
-                    "suggestion": suggestion
-                })
-    return render_template_string(TEMPLATE, code=code, metrics=metrics)
+            data = file.read()
+            code = data.decode("utf-8", errors="replace")  # echoed back into the textarea
+        if data.strip():
+            issues = detect_issues("uploaded_code.py", data)
+
+    use_ai = request.args.get("ai") == "1"
+
+    def generate():
+        yield _HEAD_TMPL.render(code=code, show_results=bool(issues))
+        if issues:
+            chunks = [issues[i:i + STREAM_BATCH_SIZE] for i in range(0, len(issues), STREAM_BATCH_SIZE)]
+            executor = ThreadPoolExecutor(max_workers=SUGGEST_WORKERS)
+            try:
+                futures = [executor.submit(suggest_issues, chunk, use_ai) for chunk in chunks]
+                for chunk, future in zip(chunks, futures):
+                    rows = []
+                    for issue, suggestion in zip(chunk, future.result()):
+                        rows.append(_ROW_TMPL.render(m=issue, suggestion=suggestion))
+                    yield "".join(rows)
+            finally:
+                # Client may disconnect mid-stream; don't keep generating for it.
+                executor.shutdown(wait=False, cancel_futures=True)
+        # Only the per-category totals go to the charts, as a fixed-length count per CATEGORIES entry.
+        counts = issues.category_counts().tolist() if issues else []
+        yield _TAIL_TMPL.render(cat_names=CATEGORIES, counts=counts, show_results=bool(issues))
+
+    return Response(stream_with_context(generate()), mimetype="text/html")
 
 # ---------------- MAIN ----------------
 if __name__ == "__main__":
@@ -0,0 +1,90 @@
+const colors = ['#e74c3c','#3498db','#2ecc71','#f1c40f','#9b59b6','#1abc9c','#fd79a8','#55efc4'];
+let barChart = null;
+let lineChart = null;
+
+function getTextColor() {
+  return document.body.classList.contains('dark') ? '#e5e7eb' : '#333';
+}
+function getGridColor() {
+  return document.body.classList.contains('dark') ? '#334155' : '#e5e7eb';
+}
+
+// Called from the results page with per-category counts computed server-side;
+// counts[i] belongs to catNames[i], and empty categories are left off the charts.
+function renderCharts(catNames, counts) {
+  const labels = [];
+  const values = [];
+  for (let i = 0; i < counts.length; i++) {
+    if (counts[i] > 0) {
+      labels.push(catNames[i]);
+      values.push(counts[i]);
+    }
+  }
+
+  // Chart.js global defaults responsive medium sizing
+  Chart.defaults.responsive = true;
+  Chart.defaults.maintainAspectRatio = false;
+
+  const commonOpts = {
+    plugins: {
+      legend: { position: 'bottom', labels: { boxWidth: 12, padding: 10 } },
+      tooltip: { enabled: true }
+    },
+    scales: {
+      x: { ticks: { color: getTextColor() }, grid: { display: false } },
+      y: { ticks: { color: getTextColor() }, grid: { color: getGridColor() } }
+    }
+  };
+
+  const barCtx = document.getElementById('barChart').getContext('2d');
+  const doughnutCtx = document.getElementById('doughnutChart').getContext('2d');
+  const lineCtx = document.getElementById('lineChart').getContext('2d');
+  const polarCtx = document.getElementById('polarChart').getContext('2d');
+
+  barChart = new Chart(barCtx, {
+    type: 'bar',
+    data: { labels, datasets: [{ label: 'Count', data: values, backgroundColor: colors }] },
+    options: commonOpts
+  });
+
+  new Chart(doughnutCtx, {
+    type: 'doughnut',
+    data: { labels, datasets: [{ data: values, backgroundColor: colors }] },
+    options: { plugins: { legend: { position: 'bottom' } } }
+  });
+
+  lineChart = new Chart(lineCtx, {
+    type: 'line',
+    data: { labels, datasets: [{ label: 'Count', data: values, fill: false, borderColor: '#6a11cb', tension: 0.3, pointBackgroundColor: '#6a11cb' }] },
+    options: { plugins: { legend: { display: false } }, scales: { x: { ticks: { color: getTextColor() } }, y: { ticks: { color: getTextColor() }, grid: { color: getGridColor() } } } }
+  });
+
+  new Chart(polarCtx, {
+    type: 'polarArea',
+    data: { labels, datasets: [{ data: values, backgroundColor: colors }] },
+    options: { plugins: { legend: { position: 'bottom' } } }
+  });
+}
+
+// Update charts when theme toggles so tick/grid colors adapt
+function refreshChartColors() {
+  const tickColor = getTextColor();
+  const gridColor = getGridColor();
+
+  [barChart, lineChart].forEach(chart => {
+    if (!chart) return;
+    if (chart.options.scales) {
+      chart.options.scales.x.ticks.color = tickColor;
+      chart.options.scales.y.ticks.color = tickColor;
+      if (chart.options.scales.y.grid) chart.options.scales.y.grid.color = gridColor;
+    }
+    chart.update();
+  });
+}
+
+function toggleDarkMode() {
+  document.body.classList.toggle('dark');
+  refreshChartColors();
+}
+window.toggleDarkMode = toggleDarkMode; // expose to button
+window.renderCharts = renderCharts;
@@ -0,0 +1,51 @@
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("numpy")
+pytest.importorskip("numba")
+
+import app
+
+EDGE_INPUTS = [
+    b"",
+    b"\n\n",
+    b"TODO",
+    b"except:",
+    b"x = 1  # TODO TODO print(\n" + b"a" * 130 + b"\ntry:\n  pass\nexcept:\n    except :  \n",
+    b"print(1)\r\nexcept:\r\n" + b"b" * 121 + b"\r\n  # TODO",
+    b"except\n:\n",
+    b"except\n\n   :\n",
+    b"\x0cexcept:\n",
+    b"except\r:\n",
+    "é".encode() * 121 + b"\n" + "é".encode() * 120,
+    b"a" * 119 + b"\x80\x80",
+    b"a" * 120 + b"\r\n",
+    b"TOD\nprint\nprint(",
+    b"a" * 120 + b"\r\r\n",
+    b"TODO\r\r\n",
+    b"except:\r\r\n",
+]
+
+
+def _rows(issues):
+    return [(i.file, i.line, i.category, i.message, i.snippet) for i in issues]
+
+
+@pytest.mark.parametrize("data", EDGE_INPUTS)
+def test_numba_and_regex_scanners_agree(data):
+    assert _rows(app._detect_issues_numba("f.py", data)) == _rows(app._detect_issues_regex("f.py", data))
+
+
+def test_bare_except_does_not_span_lines():
+    assert _rows(app._detect_issues_regex("f.py", b"except\n:\n")) == []
+
+
+def test_long_line_uses_decoded_length():
+    rows = _rows(app._detect_issues_numba("f.py", b"a" * 119 + b"\x80\x80"))
+    assert [(line, category) for _, line, category, _, _ in rows] == [(1, "Style")]
+
+
+def test_repeated_trailing_carriage_returns_are_stripped():
+    assert _rows(app._detect_issues_numba("f.py", b"a" * 120 + b"\r\r\n")) == []
+    rows = _rows(app._detect_issues_numba("f.py", b"TODO\r\r\n"))
+    assert [snippet for *_, snippet in rows] == ["TODO"]
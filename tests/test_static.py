@@ -0,0 +1,22 @@
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("numpy")
+
+import app
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+def test_versioned_asset_is_cached_forever(client):
+    assert client.get("/static/app.js?v=abc").headers["Cache-Control"] == IMMUTABLE
+
+
+@pytest.mark.parametrize("url", ["/static/app.js", "/static/nope.css"])
+def test_unversioned_or_missing_asset_is_not_immutable(client, url):
+    assert client.get(url).headers.get("Cache-Control") != IMMUTABLE